@@ -2,7 +2,8 @@
 信号引擎
 负责整合市场数据、状态检测、策略判断，生成交易信号
 """
-from typing import Dict, Any, Optional
+from collections import deque
+from typing import Deque, Dict, Any, Optional, Tuple
 from market.state_detector import StateDetector, MarketState
 from market.indicators import MarketDataProcessor
 from strategy.overheat_short import OverheatShortStrategy
@@ -29,19 +30,38 @@ class SignalEngine:
         self.overheat_strategy = OverheatShortStrategy(config, logger)
         self.trend_strategy = TrendLongStrategy(config, logger)
 
+        # 策略分发表：按名称 O(1) 查找，避免到处重复 if/elif 串
+        self._strategies = {
+            "overheat_short": self.overheat_strategy,
+            "trend_long": self.trend_strategy
+        }
+
         # 市场数据缓存
         self.current_price: Optional[float] = None
         self.daily_change: float = 0.0
         self.funding_rate: Optional[float] = None
-        self.prev_orderbook_bids: list = []
+        self.prev_orderbook_bids: Any = []  # REST 订单簿为 ndarray，切片即视图
+
+        # 资金费率方向限制快照（费率几小时才变一次，变化时才重新判断）
+        self._funding_signal: Optional[str] = None
 
         # 当前市场状态
         self.market_state: MarketState = MarketState.NEUTRAL
 
+        # 最近一次状态检测使用的指标（供 generate_signal 复用，避免重复计算）
+        self._tick_indicators: Dict[str, Any] = {}
+
         # 记录最近高点（用于策略）
         self.recent_high: Optional[float] = None
         self.recent_low: Optional[float] = None
 
+        # 最近10根K线高/低点的单调队列（(序号, 价格)，摊还 O(1) 更新）
+        self._high_dq: Deque[Tuple[int, float]] = deque()
+        self._low_dq: Deque[Tuple[int, float]] = deque()
+        self._hl_window: int = 10
+        self._hl_bar_index: int = 0
+        self._hl_last_bar_ts: Optional[str] = None
+
     def update_market_data(
         self,
         price: float,
@@ -64,6 +84,8 @@ class SignalEngine:
         """
         self.current_price = price
         self.daily_change = daily_change
+        if funding_rate != self.funding_rate:
+            self._funding_signal = self.state_detector.get_funding_rate_signal(funding_rate)
         self.funding_rate = funding_rate
 
         # 更新K线数据
@@ -72,14 +94,58 @@ class SignalEngine:
 
         # 更新订单簿
         if orderbook and "bids" in orderbook:
-            self.prev_orderbook_bids = orderbook["bids"][:5]  # 保存前5档买盘
+            # 前5档买盘：REST 层已是 ndarray，切片是零拷贝视图
+            self.prev_orderbook_bids = orderbook["bids"][:5]
 
-        # 更新最近高点和最低点
+        # 更新最近高点和最低点（单调队列，避免每个 tick 重建列表求 max/min）
         if candles_5m:
-            highs = [c["high"] for c in candles_5m[-10:]]
-            lows = [c["low"] for c in candles_5m[-10:]]
-            self.recent_high = max(highs)
-            self.recent_low = min(lows)
+            self._update_recent_high_low(candles_5m)
+
+    def _push_hl_bar(self, high: float, low: float):
+        """将一根已收盘K线推入高/低点单调队列"""
+        self._hl_bar_index += 1
+        index = self._hl_bar_index
+
+        # 高点队列保持递减，低点队列保持递增
+        while self._high_dq and self._high_dq[-1][1] <= high:
+            self._high_dq.pop()
+        self._high_dq.append((index, high))
+
+        while self._low_dq and self._low_dq[-1][1] >= low:
+            self._low_dq.pop()
+        self._low_dq.append((index, low))
+
+        # 移除滑出窗口的元素（窗口含正在形成的K线，已收盘部分只留 window-1 根）
+        expired = index - (self._hl_window - 1)
+        while self._high_dq and self._high_dq[0][0] <= expired:
+            self._high_dq.popleft()
+        while self._low_dq and self._low_dq[0][0] <= expired:
+            self._low_dq.popleft()
+
+    def _update_recent_high_low(self, candles_5m: list):
+        """
+        更新最近高点/最低点
+
+        已收盘K线进入单调队列（摊还 O(1)），正在形成的K线
+        在读取时与队首比较，不入队
+        """
+        latest = candles_5m[-1]
+        latest_ts = latest.get("timestamp")
+
+        if self._hl_last_bar_ts is None:
+            # 首次更新：把快照中已收盘的K线灌入队列
+            for c in candles_5m[-self._hl_window:-1]:
+                self._push_hl_bar(c["high"], c["low"])
+        elif latest_ts != self._hl_last_bar_ts and len(candles_5m) > 1:
+            # 新K线出现：前一根已收盘，推入队列
+            closed = candles_5m[-2]
+            self._push_hl_bar(closed["high"], closed["low"])
+
+        self._hl_last_bar_ts = latest_ts
+
+        # 队首即窗口内已收盘K线的极值，与正在形成的K线比较
+        self.recent_high = max(self._high_dq[0][1], latest["high"]) if self._high_dq else latest["high"]
+        self.recent_low = min(self._low_dq[0][1], latest["low"]) if self._low_dq else latest["low"]
 
     def detect_market_state(self) -> MarketState:
         """
@@ -106,6 +172,15 @@ class SignalEngine:
         volumes_5m = self.market_processor.get_volumes("5m")
         volumes_15m = self.market_processor.get_volumes("15m")
 
+        # 保存本次计算的指标，generate_signal 直接复用
+        self._tick_indicators = {
+            "vwap": vwap,
+            "ma_5": ma_5,
+            "ma_15": ma_15,
+            "ma_60": ma_60,
+            "volumes_5m": volumes_5m
+        }
+
         # 检测市场状态
         self.market_state = self.state_detector.detect_market_state(
             daily_change=self.daily_change,
@@ -140,35 +215,24 @@ class SignalEngine:
         if self.current_price is None:
             return None
 
-        # 获取技术指标
-        vwap = self.market_processor.get_vwap("5m")
-        ma_5 = self.market_processor.get_ma(5, "5m")
-        ma_15 = self.market_processor.get_ma(15, "5m")
-        ma_60 = self.market_processor.get_ma(60, "5m")
-
-        # 获取前一期MA（用于判断交叉）
-        closes_5m = self.market_processor.get_close_prices("5m")
-        ma_5_prev = self.market_processor.get_ma(5, "5m")
-        ma_15_prev = self.market_processor.get_ma(15, "5m")
+        # 先检测市场状态，再复用其间计算的指标，避免重复取值
+        market_state = self.detect_market_state()
 
-        if len(closes_5m) > 1:
-            # 简化的前一期MA计算
-            prev_closes = closes_5m[:-1]
-            ma_5_prev = sum(prev_closes[-5:]) / 5 if len(prev_closes) >= 5 else None
-            ma_15_prev = sum(prev_closes[-15:]) / 15 if len(prev_closes) >= 15 else None
+        vwap = self._tick_indicators.get("vwap")
+        ma_5 = self._tick_indicators.get("ma_5")
+        ma_15 = self._tick_indicators.get("ma_15")
+        volumes_5m = self._tick_indicators.get("volumes_5m")
 
-        volumes_5m = self.market_processor.get_volumes("5m")
-
-        # 检测市场状态
-        market_state = self.detect_market_state()
+        # 前一期MA（由 MarketDataProcessor 增量维护，无需重新求和）
+        ma_5_prev = self.market_processor.ma_5_prev
+        ma_15_prev = self.market_processor.ma_15_prev
 
         # 根据市场状态选择策略
         if market_state == MarketState.OVERHEATED:
             # 过热回落做空策略
             if self.overheat_strategy.params.get("enabled", True):
-                # 检查资金费率限制
-                funding_signal = self.state_detector.get_funding_rate_signal(self.funding_rate)
-                if funding_signal == "no_short":
+                # 检查资金费率限制（读快照，费率变化时已更新）
+                if self._funding_signal == "no_short":
                     self.logger.info("资金费率过低，禁止做空")
                     return None
 
@@ -192,6 +256,7 @@ class SignalEngine:
                     return {
                         "strategy": "overheat_short",
                         "direction": "short",
+                        "sign": 1.0,  # 做空限价上浮，下单路径免分支
                         "price": self.current_price,
                         "state": market_state.value
                     }
@@ -199,9 +264,8 @@ class SignalEngine:
         elif market_state == MarketState.TRENDING:
             # 趋势做多策略
             if self.trend_strategy.params.get("enabled", True):
-                # 检查资金费率限制
-                funding_signal = self.state_detector.get_funding_rate_signal(self.funding_rate)
-                if funding_signal == "no_long":
+                # 检查资金费率限制（读快照，费率变化时已更新）
+                if self._funding_signal == "no_long":
                     self.logger.info("资金费率过高，禁止做多")
                     return None
 
@@ -221,6 +285,7 @@ class SignalEngine:
                     return {
                         "strategy": "trend_long",
                         "direction": "long",
+                        "sign": -1.0,  # 做多限价下浮，下单路径免分支
                         "price": self.current_price,
                         "state": market_state.value
                     }
@@ -310,11 +375,20 @@ class SignalEngine:
         Returns:
             策略状态
         """
-        if strategy_name == "overheat_short":
-            return self.overheat_strategy.get_status()
-        elif strategy_name == "trend_long":
-            return self.trend_strategy.get_status()
-        return {}
+        strategy = self._strategies.get(strategy_name)
+        return strategy.get_status() if strategy else {}
+
+    def get_strategy(self, strategy_name: str):
+        """
+        按名称获取策略实例
+
+        Args:
+            strategy_name: 策略名称
+
+        Returns:
+            策略实例，未知名称返回 None
+        """
+        return self._strategies.get(strategy_name)
 
     def reset_strategy(self, strategy_name: str):
         """
@@ -323,7 +397,6 @@ class SignalEngine:
         Args:
             strategy_name: 策略名称
         """
-        if strategy_name == "overheat_short":
-            self.overheat_strategy.reset()
-        elif strategy_name == "trend_long":
-            self.trend_strategy.reset()
+        strategy = self._strategies.get(strategy_name)
+        if strategy:
+            strategy.reset()
@@ -2,9 +2,23 @@
 交易引擎
 负责执行交易、订单管理、止损止盈等
 """
-from typing import Dict, Any, Optional
-from datetime import datetime
+import asyncio
 import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional
+
+
+@dataclass(slots=True)
+class Position:
+    """当前持仓状态（slots 化，热路径上属性访问代替字典查找）"""
+    strategy: str
+    direction: str
+    entry_price: float
+    size: float
+    stop_price: float
+    take_profit_1r: Optional[float]
+    take_profit_2r: Optional[float]
+    entry_time_ns: int
 
 
 class TradeEngine:
@@ -32,25 +46,26 @@ class TradeEngine:
         self.leverage = self.trade_config.get("leverage", 2)
 
         # 当前持仓状态
-        self.current_position: Optional[Dict[str, Any]] = None
+        self.current_position: Optional[Position] = None
         self.current_strategy: Optional[str] = None
 
-    def initialize(self):
+    async def initialize(self):
         """初始化交易引擎"""
-        # 设置杠杆
+        # 设置杠杆和获取账户权益相互独立，并发请求减少一次往返
         self.logger.info(f"设置杠杆: {self.leverage}x")
         try:
-            self.okx_rest.set_leverage(self.symbol, self.leverage, "isolated")
+            _, equity = await asyncio.gather(
+                self.okx_rest.set_leverage_async(self.symbol, self.leverage, "isolated"),
+                self.okx_rest.get_equity_async()
+            )
         except Exception as e:
-            self.logger.error(f"设置杠杆失败: {str(e)}")
+            self.logger.error(f"初始化交易引擎失败: {str(e)}")
             raise
 
-        # 获取账户权益
-        equity = self.okx_rest.get_equity()
         self.risk_manager.update_equity(equity)
         self.logger.info(f"账户权益: {equity:.2f} USDT")
 
-    def process_entry_signal(self, signal: Dict[str, Any]) -> bool:
+    async def process_entry_signal(self, signal: Dict[str, Any]) -> bool:
         """
         处理入场信号
 
@@ -66,9 +81,11 @@ class TradeEngine:
 
         self.logger.info(f"处理入场信号: {strategy_name} {direction} @ {price}")
 
-        # 检查风控
-        equity = self.okx_rest.get_equity()
-        self.risk_manager.update_equity(equity)
+        # 检查风控（几秒内的权益缓存可直接复用，省掉一次 HTTPS 往返）
+        equity = self.risk_manager.get_cached_equity()
+        if equity is None:
+            equity = await self.okx_rest.get_equity_async()
+            self.risk_manager.update_equity(equity)
 
         # 准备交易信息
         trade_info = self.signal_engine.prepare_trade(signal, equity)
@@ -93,12 +110,10 @@ class TradeEngine:
 
         # 执行下单
         try:
-            # 下限价单（略低于/高于当前价）
+            # 下限价单（略低于/高于当前价），方向符号在信号生成时已确定
             slippage = 0.001  # 0.1% 滑点
-            if direction == "long":
-                limit_price = price * (1 - slippage)
-            else:
-                limit_price = price * (1 + slippage)
+            sign = signal.get("sign", -1.0 if direction == "long" else 1.0)
+            limit_price = price * (1.0 + slippage * sign)
 
             order = self.okx_rest.place_order(
                 symbol=self.symbol,
@@ -112,7 +127,8 @@ class TradeEngine:
             self.logger.info(f"限价单已提交: {trade_info['position_size']} @ {limit_price:.2f}")
 
             # 等待成交（简化处理，实际应该查询订单状态）
-            time.sleep(2)
+            # 异步等待，期间行情更新和出场检查可以继续运行
+            await asyncio.sleep(2)
 
             # 确认成交（简化处理，使用实际成交价格）
             actual_price = price  # 实际应该从订单获取
@@ -125,22 +141,21 @@ class TradeEngine:
             self._place_take_profit(strategy_name, direction, trade_info, size)
 
             # 更新策略状态
-            if strategy_name == "overheat_short":
-                self.signal_engine.overheat_strategy.on_entry(actual_price, size)
-            elif strategy_name == "trend_long":
-                self.signal_engine.trend_strategy.on_entry(actual_price, size)
+            strategy = self.signal_engine.get_strategy(strategy_name)
+            if strategy:
+                strategy.on_entry(actual_price, size)
 
             # 更新当前持仓状态
-            self.current_position = {
-                "strategy": strategy_name,
-                "direction": direction,
-                "entry_price": actual_price,
-                "size": size,
-                "stop_price": trade_info["stop_price"],
-                "take_profit_1r": trade_info.get("take_profit_1r"),
-                "take_profit_2r": trade_info.get("take_profit_2r"),
-                "entry_time": datetime.now()
-            }
+            self.current_position = Position(
+                strategy=strategy_name,
+                direction=direction,
+                entry_price=actual_price,
+                size=size,
+                stop_price=trade_info["stop_price"],
+                take_profit_1r=trade_info.get("take_profit_1r"),
+                take_profit_2r=trade_info.get("take_profit_2r"),
+                entry_time_ns=time.time_ns()
+            )
             self.current_strategy = strategy_name
 
             self.logger.info(f"入场成功: {strategy_name} {direction} {size} @ {actual_price:.2f}")
@@ -209,9 +224,9 @@ class TradeEngine:
         if exit_reason:
             return {
                 "strategy": self.current_strategy,
-                "direction": self.current_position["direction"],
+                "direction": self.current_position.direction,
                 "exit_reason": exit_reason,
-                "size": self.current_position["size"]
+                "size": self.current_position.size
             }
 
         return None
@@ -254,7 +269,7 @@ class TradeEngine:
                 )
 
                 # 获取当前价格
-                current_price = self.signal_engine.current_price or self.current_position["entry_price"]
+                current_price = self.signal_engine.current_price or self.current_position.entry_price
 
                 if strategy_name == "overheat_short":
                     self.signal_engine.overheat_strategy.on_partial_exit(close_size, current_price)
@@ -266,7 +281,7 @@ class TradeEngine:
             elif exit_reason == "take_profit_2r":
                 # 1.5R 平50%（趋势）
                 if strategy_name == "trend_long":
-                    close_size = self.current_position["size"] * 0.5
+                    close_size = self.current_position.size * 0.5
 
                     # 部分平仓
                     order = self.okx_rest.place_order(
@@ -276,7 +291,7 @@ class TradeEngine:
                         reduce_only=True
                     )
 
-                    current_price = self.signal_engine.current_price or self.current_position["entry_price"]
+                    current_price = self.signal_engine.current_price or self.current_position.entry_price
                     self.signal_engine.trend_strategy.on_partial_exit(close_size, current_price, "2r")
 
                     return True
@@ -290,13 +305,13 @@ class TradeEngine:
                 )
 
                 # 获取当前价格
-                current_price = self.signal_engine.current_price or self.current_position["entry_price"]
+                current_price = self.signal_engine.current_price or self.current_position.entry_price
 
                 # 计算盈亏
                 if direction == "long":
-                    pnl = (current_price - self.current_position["entry_price"]) * size
+                    pnl = (current_price - self.current_position.entry_price) * size
                 else:
-                    pnl = (self.current_position["entry_price"] - current_price) * size
+                    pnl = (self.current_position.entry_price - current_price) * size
 
                 # 记录交易
                 self.risk_manager.record_trade(pnl)
@@ -304,7 +319,7 @@ class TradeEngine:
                 if strategy_name == "overheat_short":
                     self.signal_engine.overheat_strategy.on_full_exit(current_price)
                 else:
-                    self.signal_engine.trend_long.on_full_exit(current_price, exit_reason)
+                    self.signal_engine.trend_strategy.on_full_exit(current_price, exit_reason)
 
                 # 清空持仓状态
                 self.current_position = None
@@ -327,6 +342,6 @@ class TradeEngine:
             return None
 
         return {
-            **self.current_position,
+            **asdict(self.current_position),
             "strategy_status": self.signal_engine.get_strategy_status(self.current_strategy)
         }
@@ -2,11 +2,74 @@
 OKX REST API 封装
 提供账户、交易、市场数据等功能的统一接口
 """
-import okx.Trade as Trade
-import okx.Account as Account
-import okx.MarketData as MarketData
+import asyncio
+import functools
+import json
+import sys
+import time
+
+import numpy as np
 from typing import Dict, Any, Optional
-from datetime import datetime
+
+# orjson 可用时只把 okx SDK 模块内部的 json 引用换成 orjson
+# 实现（快 3~5 倍），进程级的标准库 json 保持原样；orjson 不
+# 支持的 kwargs（indent/default 等）出现时回退标准库
+try:
+    import orjson as _orjson
+
+    class _SDKJson:
+        """注入 SDK 模块的 json 替身（SDK 只用到 loads/dumps）"""
+        loads = staticmethod(_orjson.loads)
+
+        @staticmethod
+        def dumps(obj, **kwargs):
+            if kwargs:
+                return json.dumps(obj, **kwargs)
+            return _orjson.dumps(obj).decode()
+except ImportError:
+    _orjson = None
+
+
+def _patch_sdk_json():
+    """把已加载的 okx SDK 模块的 json 引用指向 orjson 替身"""
+    if _orjson is None:
+        return
+    for name in ("okx.okxclient", "okx.utils"):
+        mod = sys.modules.get(name)
+        if mod is not None and getattr(mod, "json", None) is not None:
+            mod.json = _SDKJson
+
+
+def _okx_call(desc: str):
+    """
+    OKX 调用的统一异常包装
+
+    各方法不再各自维护 try/except 模板，异常统一转为带上下文的 Exception
+
+    Args:
+        desc: 异常时的上下文描述
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                raise Exception(f"{desc}: {str(e)}")
+        return wrapper
+    return decorator
+
+
+def _parse_book_levels(levels: list) -> np.ndarray:
+    """
+    把订单簿档位解析为 (N, 2) 的 float64 数组（价格、数量）
+
+    OKX 返回 [价格, 数量, 强平单数, 订单数] 的字符串四元组，
+    np.asarray 在 C 层一次完成全部 float 转换
+    """
+    if not levels:
+        return np.empty((0, 2), dtype=np.float64)
+    return np.asarray(levels, dtype=np.float64)[:, :2]
 
 
 class OKXRest:
@@ -23,10 +86,40 @@ class OKXRest:
             flag: 0=实盘，1=模拟盘
         """
         self.flag = flag
-        self.trade = Trade.TradeAPI(api_key, api_secret, passphrase, flag=flag)
-        self.account = Account.AccountAPI(api_key, api_secret, passphrase, flag=flag)
-        self.market = MarketData.MarketAPI(api_key, api_secret, passphrase, flag=flag)
-
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._passphrase = passphrase
+
+        # 连接复用无需额外处理：SDK 客户端基于 httpx.Client，
+        # 自带连接池和 keep-alive，每个 API 实例内部复用 TCP/TLS 连接
+
+        # 下单参数模板缓存（按交易对），避免每次下单重建固定字段
+        self._order_templates: Dict[str, Dict[str, str]] = {}
+
+    # SDK 子模块各自会拉起 schema 表等重量级初始化，
+    # 延迟到首次使用时再导入，加快冷启动
+    @functools.cached_property
+    def trade(self):
+        """交易 API（首次访问时才导入）"""
+        import okx.Trade as Trade
+        _patch_sdk_json()
+        return Trade.TradeAPI(self._api_key, self._api_secret, self._passphrase, flag=self.flag)
+
+    @functools.cached_property
+    def account(self):
+        """账户 API（首次访问时才导入）"""
+        import okx.Account as Account
+        _patch_sdk_json()
+        return Account.AccountAPI(self._api_key, self._api_secret, self._passphrase, flag=self.flag)
+
+    @functools.cached_property
+    def market(self):
+        """行情 API（首次访问时才导入）"""
+        import okx.MarketData as MarketData
+        _patch_sdk_json()
+        return MarketData.MarketAPI(self._api_key, self._api_secret, self._passphrase, flag=self.flag)
+
+    @_okx_call("获取账户余额失败")
     def get_equity(self, ccy: str = "USDT") -> float:
         """
         获取账户余额
@@ -37,17 +130,15 @@ class OKXRest:
         Returns:
             账户余额
         """
-        try:
-            res = self.account.get_account_balance()
-            if res.get("code") == "0" and res.get("data"):
-                details = res["data"][0].get("details", [])
-                for d in details:
-                    if d.get("ccy") == ccy:
-                        return float(d.get("eq", 0.0))
-            return 0.0
-        except Exception as e:
-            raise Exception(f"获取账户余额失败: {str(e)}")
-
+        res = self.account.get_account_balance()
+        if res.get("code") == "0" and res.get("data"):
+            details = res["data"][0].get("details", [])
+            for d in details:
+                if d.get("ccy") == ccy:
+                    return float(d.get("eq", 0.0))
+        return 0.0
+
+    @_okx_call("获取持仓失败")
     def get_position(self, symbol: str) -> Dict[str, Any]:
         """
         获取当前持仓
@@ -58,22 +149,20 @@ class OKXRest:
         Returns:
             持仓信息字典
         """
-        try:
-            res = self.account.get_position(instId=symbol)
-            if res.get("code") == "0" and res.get("data"):
-                positions = res["data"]
-                if positions:
-                    pos = positions[0]
-                    return {
-                        "size": float(pos.get("pos", 0)),
-                        "avg_price": float(pos.get("avgPx", 0)),
-                        "unrealized_pnl": float(pos.get("upl", 0)),
-                        "side": pos.get("posSide", "net")
-                    }
-            return {"size": 0, "avg_price": 0, "unrealized_pnl": 0, "side": "net"}
-        except Exception as e:
-            raise Exception(f"获取持仓失败: {str(e)}")
+        res = self.account.get_position(instId=symbol)
+        if res.get("code") == "0" and res.get("data"):
+            positions = res["data"]
+            if positions:
+                pos = positions[0]
+                return {
+                    "size": float(pos.get("pos", 0)),
+                    "avg_price": float(pos.get("avgPx", 0)),
+                    "unrealized_pnl": float(pos.get("upl", 0)),
+                    "side": pos.get("posSide", "net")
+                }
+        return {"size": 0, "avg_price": 0, "unrealized_pnl": 0, "side": "net"}
 
+    @_okx_call("设置杠杆异常")
     def set_leverage(self, symbol: str, leverage: int, margin_mode: str = "isolated"):
         """
         设置杠杆
@@ -83,17 +172,15 @@ class OKXRest:
             leverage: 杠杆倍数
             margin_mode: 保证金模式
         """
-        try:
-            res = self.account.set_leverage(
-                instId=symbol,
-                lever=str(leverage),
-                mgnMode=margin_mode
-            )
-            if res.get("code") != "0":
-                raise Exception(f"设置杠杆失败: {res.get('msg', 'Unknown error')}")
-        except Exception as e:
-            raise Exception(f"设置杠杆异常: {str(e)}")
+        res = self.account.set_leverage(
+            instId=symbol,
+            lever=str(leverage),
+            mgnMode=margin_mode
+        )
+        if res.get("code") != "0":
+            raise Exception(f"设置杠杆失败: {res.get('msg', 'Unknown error')}")
 
+    @_okx_call("下单异常")
     def place_order(
         self,
         symbol: str,
@@ -117,40 +204,43 @@ class OKXRest:
         Returns:
             订单信息
         """
-        try:
-            # 构建下单参数
-            params = {
-                "instId": symbol,
-                "tdMode": "isolated",
-                "side": side,
-                "ordType": order_type,
-                "sz": str(size),
-                "reduceOnly": reduce_only
-            }
-
-            # 限价单需要价格
-            if order_type == "limit" and price is not None:
-                params["px"] = str(price)
-
-            # 下单
-            res = self.trade.place_order(**params)
-
-            if res.get("code") != "0":
-                raise Exception(f"下单失败: {res.get('msg', 'Unknown error')}")
-
-            order_data = res.get("data", [{}])[0]
-            return {
-                "order_id": order_data.get("ordId"),
-                "symbol": symbol,
-                "side": side,
-                "size": size,
-                "type": order_type,
-                "price": price,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        except Exception as e:
-            raise Exception(f"下单异常: {str(e)}")
-
+        # 构建下单参数（固定字段走模板缓存）
+        template = self._order_templates.get(symbol)
+        if template is None:
+            template = {"instId": symbol, "tdMode": "isolated"}
+            self._order_templates[symbol] = template
+
+        params = {
+            **template,
+            "side": side,
+            "ordType": order_type,
+            "sz": str(size),
+            "reduceOnly": reduce_only
+        }
+
+        # 限价单需要价格
+        if order_type == "limit" and price is not None:
+            params["px"] = str(price)
+
+        # 下单
+        res = self.trade.place_order(**params)
+
+        if res.get("code") != "0":
+            raise Exception(f"下单失败: {res.get('msg', 'Unknown error')}")
+
+        order_data = res.get("data", [{}])[0]
+        return {
+            "order_id": order_data.get("ordId"),
+            "symbol": symbol,
+            "side": side,
+            "size": size,
+            "type": order_type,
+            "price": price,
+            # 纳秒整型时间戳，避免热路径上的 strftime；展示时再格式化
+            "timestamp_ns": time.time_ns()
+        }
+
+    @_okx_call("撤单异常")
     def cancel_order(self, symbol: str, order_id: str):
         """
         撤单
@@ -159,13 +249,11 @@ class OKXRest:
             symbol: 交易对
             order_id: 订单ID
         """
-        try:
-            res = self.trade.cancel_order(instId=symbol, ordId=order_id)
-            if res.get("code") != "0":
-                raise Exception(f"撤单失败: {res.get('msg', 'Unknown error')}")
-        except Exception as e:
-            raise Exception(f"撤单异常: {str(e)}")
+        res = self.trade.cancel_order(instId=symbol, ordId=order_id)
+        if res.get("code") != "0":
+            raise Exception(f"撤单失败: {res.get('msg', 'Unknown error')}")
 
+    @_okx_call("获取资金费率失败")
     def get_funding_rate(self, symbol: str) -> Optional[float]:
         """
         获取资金费率
@@ -176,16 +264,14 @@ class OKXRest:
         Returns:
             资金费率，失败返回 None
         """
-        try:
-            res = self.account.get_funding_rate(instId=symbol)
-            if res.get("code") == "0" and res.get("data"):
-                funding_rate = res["data"][0].get("fundingRate")
-                if funding_rate:
-                    return float(funding_rate)
-            return None
-        except Exception as e:
-            raise Exception(f"获取资金费率失败: {str(e)}")
-
+        res = self.account.get_funding_rate(instId=symbol)
+        if res.get("code") == "0" and res.get("data"):
+            funding_rate = res["data"][0].get("fundingRate")
+            if funding_rate:
+                return float(funding_rate)
+        return None
+
+    @_okx_call("获取订单簿失败")
     def get_order_book(self, symbol: str, depth: int = 5) -> Dict[str, Any]:
         """
         获取订单簿深度
@@ -197,17 +283,18 @@ class OKXRest:
         Returns:
             订单簿数据
         """
-        try:
-            res = self.market.books(instId=symbol, sz=str(depth))
-            if res.get("code") == "0" and res.get("data"):
-                book_data = res["data"][0]
-                asks = [[float(bid[0]), float(bid[1])] for bid in book_data.get("asks", [])]
-                bids = [[float(ask[0]), float(ask[1])] for ask in book_data.get("bids", [])]
-                return {"asks": asks, "bids": bids}
-            return {"asks": [], "bids": []}
-        except Exception as e:
-            raise Exception(f"获取订单簿失败: {str(e)}")
-
+        res = self.market.books(instId=symbol, sz=str(depth))
+        if res.get("code") == "0" and res.get("data"):
+            book_data = res["data"][0]
+            asks = _parse_book_levels(book_data.get("asks", []))
+            bids = _parse_book_levels(book_data.get("bids", []))
+            return {"asks": asks, "bids": bids}
+        return {
+            "asks": np.empty((0, 2), dtype=np.float64),
+            "bids": np.empty((0, 2), dtype=np.float64)
+        }
+
+    @_okx_call("获取ticker失败")
     def get_ticker(self, symbol: str) -> Dict[str, Any]:
         """
         获取ticker信息
@@ -218,21 +305,19 @@ class OKXRest:
         Returns:
             ticker数据
         """
-        try:
-            res = self.market.ticker(instId=symbol)
-            if res.get("code") == "0" and res.get("data"):
-                ticker_data = res["data"][0]
-                return {
-                    "last_price": float(ticker_data.get("last", 0)),
-                    "volume_24h": float(ticker_data.get("volCcy24h", 0)),
-                    "change_24h": float(ticker_data.get("chg", 0)),
-                    "high_24h": float(ticker_data.get("high24h", 0)),
-                    "low_24h": float(ticker_data.get("low24h", 0))
-                }
-            return {}
-        except Exception as e:
-            raise Exception(f"获取ticker失败: {str(e)}")
+        res = self.market.ticker(instId=symbol)
+        if res.get("code") == "0" and res.get("data"):
+            ticker_data = res["data"][0]
+            return {
+                "last_price": float(ticker_data.get("last", 0)),
+                "volume_24h": float(ticker_data.get("volCcy24h", 0)),
+                "change_24h": float(ticker_data.get("chg", 0)),
+                "high_24h": float(ticker_data.get("high24h", 0)),
+                "low_24h": float(ticker_data.get("low24h", 0))
+            }
+        return {}
 
+    @_okx_call("获取24小时涨跌幅失败")
     def get_daily_change(self, symbol: str) -> float:
         """
         获取24小时涨跌幅
@@ -243,11 +328,8 @@ class OKXRest:
         Returns:
             24小时涨跌幅
         """
-        try:
-            ticker = self.get_ticker(symbol)
-            return ticker.get("change_24h", 0.0)
-        except Exception as e:
-            raise Exception(f"获取24小时涨跌幅失败: {str(e)}")
+        ticker = self.get_ticker(symbol)
+        return ticker.get("change_24h", 0.0)
 
     def close_position(self, symbol: str, side: str, size: Optional[float] = None) -> Dict[str, Any]:
         """
@@ -274,3 +356,28 @@ class OKXRest:
             size=size,
             reduce_only=True
         )
+
+    # ------------------------------------------------------------------
+    # 异步包装：SDK 是同步阻塞的，放到线程池执行避免卡住事件循环；
+    # 相互独立的调用可以用 asyncio.gather 并发发出
+    # ------------------------------------------------------------------
+
+    async def get_equity_async(self, ccy: str = "USDT") -> float:
+        """get_equity 的异步包装"""
+        return await asyncio.to_thread(self.get_equity, ccy)
+
+    async def set_leverage_async(self, symbol: str, leverage: int, margin_mode: str = "isolated"):
+        """set_leverage 的异步包装"""
+        return await asyncio.to_thread(self.set_leverage, symbol, leverage, margin_mode)
+
+    async def get_funding_rate_async(self, symbol: str) -> Optional[float]:
+        """get_funding_rate 的异步包装"""
+        return await asyncio.to_thread(self.get_funding_rate, symbol)
+
+    async def get_ticker_async(self, symbol: str) -> Dict[str, Any]:
+        """get_ticker 的异步包装"""
+        return await asyncio.to_thread(self.get_ticker, symbol)
+
+    async def get_order_book_async(self, symbol: str, depth: int = 5) -> Dict[str, Any]:
+        """get_order_book 的异步包装"""
+        return await asyncio.to_thread(self.get_order_book, symbol, depth)
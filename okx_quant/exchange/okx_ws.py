@@ -3,7 +3,10 @@ OKX WebSocket 行情模块
 基于 websockets 库实现，参考成功的 OKX WebSocket 连接代码
 """
 import asyncio
+import functools
+import operator
 import json
+import logging
 import ssl
 import certifi
 import hmac
@@ -13,7 +16,83 @@ import time
 import os
 from typing import Dict, Any, Optional, Callable, List
 
+import numpy as np
 import websockets
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+from utils._njit import njit
+
+logger = logging.getLogger(__name__)
+
+
+@njit(cache=True, fastmath=True)
+def _sma_tail(prices: np.ndarray, window: int) -> float:
+    """窗口均值热点循环"""
+    total = 0.0
+    n = prices.shape[0]
+    for i in range(n - window, n):
+        total += prices[i]
+    return total / window
+
+
+@njit(cache=True, fastmath=True)
+def _stdev_tail(prices: np.ndarray, window: int) -> float:
+    """窗口标准差热点循环（总体标准差）"""
+    n = prices.shape[0]
+    mean = 0.0
+    for i in range(n - window, n):
+        mean += prices[i]
+    mean /= window
+
+    var = 0.0
+    for i in range(n - window, n):
+        diff = prices[i] - mean
+        var += diff * diff
+    return (var / window) ** 0.5
+
+
+@njit(cache=True, fastmath=True)
+def _ema_tail(prices: np.ndarray, alpha: float) -> float:
+    """EMA 热点循环（首值做种子）"""
+    ema = prices[0]
+    for i in range(1, prices.shape[0]):
+        ema = alpha * prices[i] + (1.0 - alpha) * ema
+    return ema
+
+
+# tickers 频道字段固定，一次 C 层 itemgetter 取代六次 .get()
+_TICKER_FIELDS = operator.itemgetter("last", "bidPx", "askPx", "volCcy24h", "chg", "ts")
+
+# orjson 解析交易所短报文比标准库快 2~4 倍，且 str/bytes 都能直接解析；
+# 不可用时回退标准库 json
+try:
+    import orjson as _fastjson
+
+    _json_loads = _fastjson.loads
+    _json_dumps = _fastjson.dumps  # 返回 bytes，可直接交给 ws.send
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# uvloop（libuv 实现的事件循环）对高频帧的回调调度开销明显更低，
+# 导入时安装策略后 asyncio.run 自动使用；不可用（如 Windows）保持默认循环
+try:
+    import uvloop
+
+    uvloop.install()
+except ImportError:
+    pass
+
+
+def _parse_book_levels(levels: list) -> np.ndarray:
+    """订单簿档位批量解析为 (N, 2) float64 数组，一次 C 层转换"""
+    if not levels:
+        return np.empty((0, 2), dtype=np.float64)
+    return np.asarray(levels, dtype=np.float64)[:, :2]
 
 
 class OKXWS:
@@ -27,7 +106,9 @@ class OKXWS:
 
     def __init__(self, symbol: str, flag: str = "0", api_key: Optional[str] = None,
                  api_secret: Optional[str] = None, passphrase: Optional[str] = None,
-                 simulate: bool = False, proxy: Optional[str] = None):
+                 simulate: bool = False, proxy: Optional[str] = None,
+                 async_callbacks: bool = False, ticker_coalesce_ms: float = 0,
+                 compression: Optional[str] = None):
         """
         初始化 WebSocket 客户端
 
@@ -39,6 +120,13 @@ class OKXWS:
             passphrase: API Passphrase（私有频道需要）
             simulate: 是否使用模拟模式（不连接真实 WebSocket）
             proxy: 代理地址（暂不支持，websockets 库限制）
+            async_callbacks: 回调是否投递到线程池执行（回调做重计算
+                时开启，避免阻塞事件循环拖慢收包）
+            ticker_coalesce_ms: ticker 合并窗口（毫秒）。大于 0 时
+                窗口内的 ticker 攒成列表一次交给回调，0 表示逐条分发
+            compression: WebSocket 压缩扩展。默认 None 关闭
+                permessage-deflate——行情帧很小，省带宽不抵每帧
+                zlib 的 CPU 开销；需要时传 "deflate"
         """
         self.symbol = symbol
         self.flag = flag
@@ -46,7 +134,10 @@ class OKXWS:
         self.api_secret = api_secret
         self.passphrase = passphrase
         self.simulate = simulate
-        self.proxy = proxy
+        self.compression = compression
+        # 代理在构造时解析一次（参数优先，其次 OKX_PROXY 环境变量），
+        # 不在运行期改写进程级环境变量
+        self.proxy = proxy or os.environ.get("OKX_PROXY") or None
 
         # WebSocket 连接
         self._ws_public: Optional[websockets.WebSocketClientProtocol] = None
@@ -54,51 +145,150 @@ class OKXWS:
         self._running = False
         self._tasks: List[asyncio.Task] = []
 
+        # 入站消息队列：消费任务只入队，分发由独立任务成批处理，
+        # 慢回调不会拖住 WebSocket 读循环
+        self._inbound: asyncio.Queue = asyncio.Queue(maxsize=10000)
+
+        # 停机事件：stop() 置位即刻唤醒，避免任何轮询等待
+        self._stop_event: asyncio.Event = asyncio.Event()
+
+        # 回调异常限速记录的上次落日志时间
+        self._last_err_log: float = 0.0
+
+        # 重回调的线程池执行器（默认关闭，纯读快照的轻回调
+        # 留在事件循环里反而更快）
+        self._cb_executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="okxws-cb")
+            if async_callbacks else None
+        )
+
+        # ticker 合并窗口：>0 时突发帧在窗口内攒批，一次回调摊薄
+        # 每帧的 Python 调用开销
+        self._ticker_coalesce: float = ticker_coalesce_ms / 1000.0
+        self._ticker_buf: List = []
+        self._ticker_flush_scheduled: bool = False
+
+        # start() 前累积的额外公共频道订阅，届时与默认频道
+        # 合并成一个订阅帧发出，避免逐频道的往返
+        self._pending_subs: List[Dict] = []
+
+        # 订阅帧序列化结果缓存：重连/重启时直接复用同一份 bytes。
+        # 以实际频道列表为键，频道集合变化（add_subscription /
+        # start 传入不同列表）时自动重建，不会发出过期订阅帧
+        self._sub_payload: Optional[bytes] = None
+        self._sub_channels: Optional[List[Dict]] = None
+
+        # 频道分发表：一次 dict 查找取代 if/elif 串；K线频道按
+        # 具体周期注册（订阅时或首帧时），免去每条消息的
+        # startswith/replace
+        self._routes: Dict[str, Callable] = {
+            "tickers": self._handle_ticker,
+            "books": self._handle_orderbook,
+            "orders": self._handle_order,
+            "positions": self._handle_position,
+            "account": self._handle_balance,
+        }
+
         # 市场数据缓存
         self.last_price: Optional[float] = None
         self.last_ticker: Optional[Dict[str, Any]] = None
         self.last_candles: Dict[str, List[Dict]] = {}
         self.last_orderbook: Optional[Dict[str, Any]] = None
 
-        # 回调函数列表
-        self.callbacks: Dict[str, List[Callable]] = {
-            "ticker": [],
-            "candle": [],
-            "orderbook": [],
-            "order": [],
-            "position": [],
-            "balance": []
-        }
+        # 无回调订阅时暂存原始报文，getter 调用时再物化，
+        # 免去没人消费也照做的解析与字典构建
+        self._ticker_raw: Optional[Dict] = None
+        self._ticker_key: Optional[tuple] = None
+        self._book_raw: Optional[Dict] = None
+        self._candle_raw: Dict[str, List] = {}
+
+        # 回调函数列表：分发路径直接读属性，省掉每条消息一次
+        # dict.get() 和默认空列表的构造
+        self._ticker_cbs: List[Callable] = []
+        self._candle_cbs: List[Callable] = []
+        self._book_cbs: List[Callable] = []
+        self._order_cbs: List[Callable] = []
+        self._position_cbs: List[Callable] = []
+        self._balance_cbs: List[Callable] = []
+
+        # HMAC 模板：SHA-256 的密钥展开在构造时做一次，
+        # 每次签名只 copy() 模板再喂消息
+        self._hmac_template: Optional[hmac.HMAC] = (
+            hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+            if api_secret else None
+        )
 
         # SSL 上下文
         self._ssl_context = ssl.create_default_context(cafile=certifi.where())
 
         if self.proxy:
-            print(f"[OKXWS] 注意: websockets 库对代理支持有限")
+            logger.info("websockets 库对代理支持有限")
+
+    def add_subscription(self, channel: Dict[str, Any]):
+        """
+        追加公共频道订阅
+
+        start() 时与默认频道合并为单个 subscribe 帧发出
+
+        Args:
+            channel: 频道字典，如 {"channel": "tickers", "instId": ...}
+        """
+        self._pending_subs.append(channel)
 
     def on_ticker(self, callback: Callable):
         """注册 ticker 回调"""
-        self.callbacks["ticker"].append(callback)
+        self._ticker_cbs.append(self._wrap(callback, "ticker"))
 
     def on_candle(self, callback: Callable):
         """注册 K线回调"""
-        self.callbacks["candle"].append(callback)
+        self._candle_cbs.append(self._wrap(callback, "candle"))
 
     def on_orderbook(self, callback: Callable):
         """注册订单簿回调"""
-        self.callbacks["orderbook"].append(callback)
+        self._book_cbs.append(self._wrap(callback, "orderbook"))
 
     def on_order(self, callback: Callable):
         """注册订单更新回调"""
-        self.callbacks["order"].append(callback)
+        self._order_cbs.append(self._wrap(callback, "order"))
 
     def on_position(self, callback: Callable):
         """注册持仓更新回调"""
-        self.callbacks["position"].append(callback)
+        self._position_cbs.append(self._wrap(callback, "position"))
 
     def on_balance(self, callback: Callable):
         """注册余额更新回调"""
-        self.callbacks["balance"].append(callback)
+        self._balance_cbs.append(self._wrap(callback, "balance"))
+
+    def _run_callback(self, callback: Callable, what: str, args: tuple):
+        """线程池里实际执行回调"""
+        try:
+            callback(*args)
+        except Exception:
+            self._log_callback_error(what)
+
+    def _wrap(self, callback: Callable, what: str) -> Callable:
+        """
+        注册时把异常处理（及线程池投递）包进闭包
+
+        分发热循环因此不再携带 try/except 帧，每条消息每个回调
+        省一次异常块的建立与撤销
+        """
+        def safe(*args):
+            if self._cb_executor is not None:
+                self._cb_executor.submit(self._run_callback, callback, what, args)
+                return
+            try:
+                callback(*args)
+            except Exception:
+                self._log_callback_error(what)
+        return safe
+
+    def _log_callback_error(self, what: str):
+        """限速记录回调异常：错误风暴时最多每秒一条，不拖慢分发"""
+        now = time.monotonic()
+        if now - self._last_err_log >= 1.0:
+            self._last_err_log = now
+            logger.exception("%s callback failed", what)
 
     def _get_timestamp(self) -> str:
         """获取 ISO 格式时间戳"""
@@ -118,135 +308,288 @@ class OKXWS:
         Returns:
             签名字符串
         """
-        if not self.api_secret:
+        if self._hmac_template is None:
             raise ValueError("API Secret is required for signing")
 
         message = timestamp + method.upper() + request_path + body
-        mac = hmac.new(
-            bytes(self.api_secret, encoding='utf8'),
-            bytes(message, encoding='utf-8'),
-            digestmod=hashlib.sha256
-        )
+        mac = self._hmac_template.copy()
+        mac.update(message.encode("utf-8"))
         return base64.b64encode(mac.digest()).decode("utf-8")
 
+    @staticmethod
+    def _build_ticker(ticker_data: Dict) -> Dict[str, Any]:
+        """把 OKX 原始 ticker 报文物化为内部字典"""
+        return {
+            "last": float(ticker_data.get("last", 0)),
+            "bid": float(ticker_data.get("bidPx", 0)),
+            "ask": float(ticker_data.get("askPx", 0)),
+            "volume_24h": float(ticker_data.get("volCcy24h", 0)),
+            "change_24h": float(ticker_data.get("chg", 0)),
+            "timestamp": ticker_data.get("ts", "")
+        }
+
     def _handle_ticker(self, data: List[Dict]):
         """处理 ticker 数据"""
         if not data:
             return
 
         ticker_data = data[0]
-        self.last_price = float(ticker_data.get("last", 0))
+        try:
+            last, bid, ask, vol, chg, ts = _TICKER_FIELDS(ticker_data)
+        except KeyError:
+            return
+
+        # 冷清时段 OKX 会推送内容相同的 ticker；原始字符串相等
+        # 即数值相等，直接跳过重建与回调分发
+        key = (last, bid, ask)
+        if key == self._ticker_key:
+            return
+        self._ticker_key = key
+
+        self.last_price = float(last)
+
+        # 没有回调时只存原始报文，get_ticker 调用时再物化
+        if not self._ticker_cbs:
+            self._ticker_raw = ticker_data
+            return
+
+        self._ticker_raw = None
         self.last_ticker = {
             "last": self.last_price,
-            "bid": float(ticker_data.get("bidPx", 0)),
-            "ask": float(ticker_data.get("askPx", 0)),
-            "volume_24h": float(ticker_data.get("volCcy24h", 0)),
-            "change_24h": float(ticker_data.get("chg", 0)),
-            "timestamp": ticker_data.get("ts", "")
+            "bid": float(bid),
+            "ask": float(ask),
+            "volume_24h": float(vol),
+            "change_24h": float(chg),
+            "timestamp": ts
         }
 
-        # 触发回调
-        for callback in self.callbacks.get("ticker", []):
-            try:
-                callback(self.last_ticker.copy())
-            except Exception as e:
-                print(f"[OKXWS] Ticker callback error: {e}")
+        # 触发回调：所有回调共享同一只读视图，零拷贝且不可误改
+        snapshot = MappingProxyType(self.last_ticker)
+
+        # 合并模式：窗口内攒批，到期一次交付列表
+        if self._ticker_coalesce > 0.0:
+            self._ticker_buf.append(snapshot)
+            if not self._ticker_flush_scheduled:
+                self._ticker_flush_scheduled = True
+                asyncio.get_running_loop().call_later(
+                    self._ticker_coalesce, self._flush_tickers
+                )
+            return
 
-    def _handle_candle(self, data: List[Dict], timeframe: str):
-        """处理 K线数据"""
-        if not data:
+        for callback in self._ticker_cbs:
+            callback(snapshot)
+
+    def _flush_tickers(self):
+        """合并窗口到期，把缓冲的 ticker 批量交给回调"""
+        self._ticker_flush_scheduled = False
+        batch, self._ticker_buf = self._ticker_buf, []
+        if not batch:
             return
+        for callback in self._ticker_cbs:
+            callback(batch)
 
+    @staticmethod
+    def _build_candles(data: List) -> List[Dict]:
+        """把 OKX 原始 K线数组物化为内部字典列表
+
+        批量回补（如订阅首帧的百根K线）时数值块用 astype 一次
+        C 层解析；单帧或不规则数据走逐行转换
+        """
         candles = []
+
+        # numba 不编译字符串对象数组，批量解析的等价优化是
+        # numpy 的 astype；小批量时构造数组的开销反而更大
+        if len(data) > 8:
+            try:
+                cols = np.asarray(data)[:, 1:7].astype(np.float64)
+            except (ValueError, IndexError):
+                cols = None
+            if cols is not None:
+                for i, candle in enumerate(data):
+                    o, h, l, c, v, vc = cols[i].tolist()
+                    candles.append({
+                        "timestamp": candle[0],
+                        "open": o,
+                        "high": h,
+                        "low": l,
+                        "close": c,
+                        "volume": v,
+                        "volume_ccy": vc
+                    })
+                return candles
+
         for candle in data:
+            # 一次 map(float, ...) 切片转换，少走六次下标字节码
+            o, h, l, c, v, vc = map(float, candle[1:7])
             candles.append({
                 "timestamp": candle[0],
-                "open": float(candle[1]),
-                "high": float(candle[2]),
-                "low": float(candle[3]),
-                "close": float(candle[4]),
-                "volume": float(candle[5]),
-                "volume_ccy": float(candle[6])
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c,
+                "volume": v,
+                "volume_ccy": vc
             })
+        return candles
 
+    def _handle_candle(self, data: List[Dict], timeframe: str):
+        """处理 K线数据"""
+        if not data:
+            return
+
+        # 没有回调时只存原始报文，get_candles 调用时再物化
+        if not self._candle_cbs:
+            self._candle_raw[timeframe] = data
+            return
+
+        self._candle_raw.pop(timeframe, None)
+        candles = self._build_candles(data)
         self.last_candles[timeframe] = candles
 
-        # 触发回调
-        for callback in self.callbacks.get("candle", []):
-            try:
-                callback(timeframe, candles.copy())
-            except Exception as e:
-                print(f"[OKXWS] Candle callback error: {e}")
+        # 触发回调：共享同一 tuple 快照，不可变且所有回调零拷贝
+        snapshot = tuple(candles)
+        for callback in self._candle_cbs:
+            callback(timeframe, snapshot)
+
+    @staticmethod
+    def _build_orderbook(book_data: Dict) -> Dict[str, Any]:
+        """把 OKX 原始订单簿报文物化为内部字典
+
+        np.asarray 一次完成全部 float 解析，替换原来逐档的双重列表
+        推导（顺带修正 asks/bids 循环变量名写反的问题）
+        """
+        return {
+            "asks": _parse_book_levels(book_data.get("asks", [])),
+            "bids": _parse_book_levels(book_data.get("bids", [])),
+            "timestamp": book_data.get("ts", "")
+        }
 
     def _handle_orderbook(self, data: List[Dict]):
         """处理订单簿数据"""
         if not data:
             return
 
-        book_data = data[0]
-        asks = [[float(bid[0]), float(bid[1])] for bid in book_data.get("asks", [])]
-        bids = [[float(ask[0]), float(ask[1])] for ask in book_data.get("bids", [])]
-
-        self.last_orderbook = {
-            "asks": asks,
-            "bids": bids,
-            "timestamp": book_data.get("ts", "")
-        }
-
-        # 触发回调
-        for callback in self.callbacks.get("orderbook", []):
-            try:
-                callback(self.last_orderbook.copy())
-            except Exception as e:
-                print(f"[OKXWS] Orderbook callback error: {e}")
+        # 没有回调时只存原始报文，get_orderbook 调用时再物化，
+        # 省掉整本订单簿的 float 解析
+        if not self._book_cbs:
+            self._book_raw = data[0]
+            return
 
-    def _handle_message(self, message: str):
-        """处理 WebSocket 消息"""
+        self._book_raw = None
+        self.last_orderbook = self._build_orderbook(data[0])
+
+        # 触发回调：所有回调共享同一只读视图，零拷贝且不可误改
+        snapshot = MappingProxyType(self.last_orderbook)
+        for callback in self._book_cbs:
+            callback(snapshot)
+
+    def _handle_order(self, data: List[Dict]):
+        """处理订单更新"""
+        for callback in self._order_cbs:
+            callback(data)
+
+    def _handle_position(self, data: List[Dict]):
+        """处理持仓更新"""
+        for callback in self._position_cbs:
+            callback(data)
+
+    def _handle_balance(self, data: List[Dict]):
+        """处理账户更新"""
+        for callback in self._balance_cbs:
+            callback(data)
+
+    def _register_candle_route(self, channel: str):
+        """为具体周期的 K线频道注册处理器（如 candle5m -> 5m）"""
+        if channel.startswith("candle") and channel not in self._routes:
+            # 前缀定长，直接切片比 replace 少一次全串扫描
+            timeframe = channel[6:]
+            self._routes[channel] = functools.partial(
+                self._handle_candle, timeframe=timeframe
+            )
+
+    def _handle_message(self, message):
+        """处理 WebSocket 消息（接受原始帧或已解析的 dict）"""
         try:
-            data = json.loads(message)
+            data = message if isinstance(message, dict) else _json_loads(message)
             arg = data.get("arg", {})
             channel = arg.get("channel", "")
             msg_data = data.get("data", [])
 
             # 订阅响应
             if data.get("event") == "subscribe":
-                print(f"[OKXWS] 订阅成功: {arg}")
+                logger.info("订阅成功: %s", arg)
                 return
 
-            # 数据消息
-            if channel == "tickers":
-                self._handle_ticker(msg_data)
-            elif channel.startswith("candle"):
-                timeframe = channel.replace("candle", "")
-                self._handle_candle(msg_data, timeframe)
-            elif channel == "books":
-                self._handle_orderbook(msg_data)
-            elif channel == "orders":
-                # 订单更新
-                for callback in self.callbacks.get("order", []):
-                    try:
-                        callback(msg_data)
-                    except Exception as e:
-                        print(f"[OKXWS] Order callback error: {e}")
-            elif channel == "positions":
-                # 持仓更新
-                for callback in self.callbacks.get("position", []):
-                    try:
-                        callback(msg_data)
-                    except Exception as e:
-                        print(f"[OKXWS] Position callback error: {e}")
-            elif channel == "account":
-                # 账户更新
-                for callback in self.callbacks.get("balance", []):
-                    try:
-                        callback(msg_data)
-                    except Exception as e:
-                        print(f"[OKXWS] Balance callback error: {e}")
-
-        except json.JSONDecodeError as e:
-            print(f"[OKXWS] JSON 解析错误: {e}")
-        except Exception as e:
-            print(f"[OKXWS] 消息处理错误: {e}")
+            # 数据消息：分发表一次查找；未注册的 K线周期首帧时补注册
+            handler = self._routes.get(channel)
+            if handler is None and channel.startswith("candle"):
+                self._register_candle_route(channel)
+                handler = self._routes.get(channel)
+            if handler is not None:
+                handler(msg_data)
+
+        except ValueError:
+            # json.JSONDecodeError 和 orjson.JSONDecodeError 都是 ValueError 子类
+            logger.exception("JSON 解析错误")
+        except Exception:
+            logger.exception("消息处理错误")
+
+    def _enqueue(self, message):
+        """消息入队；队列打满时丢最旧保最新"""
+        try:
+            self._inbound.put_nowait(message)
+        except asyncio.QueueFull:
+            self._inbound.get_nowait()
+            self._inbound.put_nowait(message)
+
+    # 无状态频道：消费方只关心最新快照，批内旧快照可直接丢弃
+    _COALESCE_CHANNELS = frozenset({"tickers", "books"})
+
+    async def _dispatch_loop(self):
+        """
+        批量分发入站消息
+
+        每次唤醒把队列里已积压的消息一并取出（上限 64 条）。
+        tickers/books 属于无状态快照，批内只处理最新一条，
+        突发行情下省掉中间快照的构建与回调；K线和私有频道
+        是有状态增量，保持顺序逐条处理。None 作为停机哨兵
+        """
+        while self._running:
+            message = await self._inbound.get()
+            if message is None:
+                break
+
+            batch = [message]
+            while len(batch) < 64 and not self._inbound.empty():
+                batch.append(self._inbound.get_nowait())
+
+            # 先统一解析，记录每个无状态频道最新一条的位置
+            parsed = []
+            for msg in batch:
+                if msg is None:
+                    return
+                try:
+                    parsed.append(_json_loads(msg))
+                except ValueError:
+                    logger.exception("JSON 解析错误")
+
+            # 只有携带 data 且不带 event 的才是可合并的数据帧；
+            # 订阅/错误确认（event 帧）即使 arg.channel 相同也要逐条放行
+            latest_idx: Dict[str, int] = {}
+            coalescable = []
+            for i, data in enumerate(parsed):
+                is_snapshot = (
+                    "event" not in data and "data" in data
+                    and data.get("arg", {}).get("channel", "") in self._COALESCE_CHANNELS
+                )
+                coalescable.append(is_snapshot)
+                if is_snapshot:
+                    latest_idx[data["arg"]["channel"]] = i
+
+            for i, data in enumerate(parsed):
+                if coalescable[i] and latest_idx[data["arg"]["channel"]] != i:
+                    continue  # 批内已有更新的快照
+                self._handle_message(data)
 
     async def _consume_public(self, ws: websockets.WebSocketClientProtocol):
         """
@@ -259,11 +602,11 @@ class OKXWS:
             async for message in ws:
                 if not self._running:
                     break
-                self._handle_message(message)
+                self._enqueue(message)
         except websockets.exceptions.ConnectionClosed:
-            print(f"[OKXWS] 公共频道连接已关闭")
-        except Exception as e:
-            print(f"[OKXWS] 公共频道消息消费错误: {e}")
+            logger.info("公共频道连接已关闭")
+        except Exception:
+            logger.exception("公共频道消息消费错误")
 
     async def _consume_private(self, ws: websockets.WebSocketClientProtocol):
         """
@@ -276,11 +619,11 @@ class OKXWS:
             async for message in ws:
                 if not self._running:
                     break
-                self._handle_message(message)
+                self._enqueue(message)
         except websockets.exceptions.ConnectionClosed:
-            print(f"[OKXWS] 私有频道连接已关闭")
-        except Exception as e:
-            print(f"[OKXWS] 私有频道消息消费错误: {e}")
+            logger.info("私有频道连接已关闭")
+        except Exception:
+            logger.exception("私有频道消息消费错误")
 
     async def start(self, public_channels: Optional[List[Dict]] = None, private_channels: Optional[List[Dict]] = None):
         """
@@ -291,14 +634,15 @@ class OKXWS:
             private_channels: 私有频道订阅列表
         """
         if self._running:
-            print("[OKXWS] WebSocket 已经在运行")
+            logger.info("WebSocket 已经在运行")
             return
 
         self._running = True
+        self._stop_event.clear()
 
         # 模拟模式
         if self.simulate:
-            print("[OKXWS] 模拟模式已启用，生成模拟数据")
+            logger.info("模拟模式已启用，生成模拟数据")
             await self._simulate_data()
             return
 
@@ -316,58 +660,145 @@ class OKXWS:
                     {"channel": "books", "instId": self.symbol}
                 ]
 
+            # 合并 start() 前累积的订阅，整批只发一个订阅帧
+            if self._pending_subs:
+                public_channels = public_channels + self._pending_subs
+
+            # 订阅时就把各 K线周期注册进分发表
+            for ch in public_channels:
+                self._register_candle_route(ch.get("channel", ""))
+
             # 启动公共频道
             if public_channels:
-                print(f"[OKXWS] 启动公共频道 WebSocket: {public_url}")
+                logger.info("启动公共频道 WebSocket: %s", public_url)
+
+                # 分发任务先于消费启动
+                self._tasks.append(asyncio.create_task(self._dispatch_loop()))
 
                 # 使用 SSL 上下文连接
-                async with websockets.connect(public_url, ssl=self._ssl_context) as ws:
+                async with websockets.connect(
+                    public_url,
+                    ssl=self._ssl_context,
+                    compression=self.compression,
+                    max_size=2 ** 20,
+                    max_queue=256,
+                    ping_interval=20,
+                    ping_timeout=20
+                ) as ws:
                     self._ws_public = ws
 
-                    # 订阅
-                    sub_msg = {"op": "subscribe", "args": public_channels}
-                    await ws.send(json.dumps(sub_msg))
-                    print(f"[OKXWS] 公共频道订阅请求已发送: {[c['channel'] for c in public_channels]}")
-
-                    # 消费消息
-                    await self._consume_public(ws)
+                    # 订阅（序列化一次后缓存，发 bytes 省掉内部 UTF-8 编码；
+                    # 频道列表与上次不同时重建）
+                    if self._sub_payload is None or self._sub_channels != public_channels:
+                        sub_msg = {"op": "subscribe", "args": public_channels}
+                        self._sub_payload = _json_dumps(sub_msg)
+                        self._sub_channels = list(public_channels)
+                    await ws.send(self._sub_payload)
+                    logger.info("公共频道订阅请求已发送: %s", [c["channel"] for c in public_channels])
+
+                    # 消费任务与停机事件竞争：stop() 置位后立即返回，
+                    # 不必等下一帧才发现 _running 已翻转
+                    consume_task = asyncio.create_task(self._consume_public(ws))
+                    stop_task = asyncio.create_task(self._stop_event.wait())
+                    _, pending = await asyncio.wait(
+                        {consume_task, stop_task},
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in pending:
+                        task.cancel()
+
+                # 连接结束后通知分发任务退出
+                self._enqueue(None)
 
             # 注意：私有频道需要单独的连接
             # 由于使用了 async with，私有频道的实现需要在实际使用时单独处理
 
-        except Exception as e:
-            print(f"[OKXWS] WebSocket 启动失败: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("WebSocket 启动失败")
             self._running = False
+            # 连接失败时分发任务可能已挂在队列上等待；这里翻转了
+            # _running 之后 stop() 会提前返回，不在此收尾任务就会
+            # 悬挂泄漏，最终在销毁时报 "Task was destroyed but it is
+            # pending"。发哨兵并取消等待后再返回
+            self._enqueue(None)
+            if self._tasks:
+                for task in self._tasks:
+                    task.cancel()
+                await asyncio.wait(self._tasks, timeout=5.0)
+                self._tasks.clear()
 
     async def stop(self):
         """停止 WebSocket 连接"""
         if not self._running:
             return
 
-        print("[OKXWS] 正在停止 WebSocket...")
+        logger.info("正在停止 WebSocket...")
         self._running = False
+        self._stop_event.set()
+        self._enqueue(None)  # 唤醒分发任务退出
+
+        # 批量取消后一起等待：收尾耗时取决于最慢任务而非总和，
+        # 卡住的任务最多拖 5 秒
+        if self._tasks:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.wait(self._tasks, timeout=5.0)
+            self._tasks.clear()
+
+        # 两条连接并发关闭（start 的 async with 未覆盖时兜底）
+        closers = [
+            ws.close() for ws in (self._ws_public, self._ws_private)
+            if ws is not None
+        ]
+        if closers:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*closers, return_exceptions=True),
+                    timeout=5.0
+                )
+            except asyncio.TimeoutError:
+                logger.warning("连接关闭超时")
 
-        # async with 会自动关闭连接
         self._ws_public = None
         self._ws_private = None
 
+        # 回调线程池一并关停，未开始的任务直接丢弃
+        if self._cb_executor is not None:
+            self._cb_executor.shutdown(wait=False, cancel_futures=True)
+
     def get_price(self) -> Optional[float]:
         """获取最新价格"""
         return self.last_price
 
-    def get_ticker(self) -> Optional[Dict[str, Any]]:
-        """获取最新 ticker"""
-        return self.last_ticker.copy() if self.last_ticker else None
+    def get_ticker(self, copy: bool = False) -> Optional[Dict[str, Any]]:
+        """获取最新 ticker（默认返回只读视图，需要可变副本时传 copy=True）"""
+        if self._ticker_raw is not None:
+            self.last_ticker = self._build_ticker(self._ticker_raw)
+            self._ticker_raw = None
+        if self.last_ticker is None:
+            return None
+        return self.last_ticker.copy() if copy else MappingProxyType(self.last_ticker)
 
-    def get_candles(self, timeframe: str = "5m") -> List[Dict]:
-        """获取 K线数据"""
-        return self.last_candles.get(timeframe, []).copy()
+    def get_candles(self, timeframe: str = "5m", copy: bool = False):
+        """获取 K线数据（默认返回只读 tuple，需要可变副本时传 copy=True）
 
-    def get_orderbook(self) -> Optional[Dict[str, Any]]:
-        """获取订单簿"""
-        return self.last_orderbook.copy() if self.last_orderbook else None
+        tuple 化是 C 层的指针拷贝，比切片复制列表便宜，且支持
+        下游现有的切片/负索引用法
+        """
+        raw = self._candle_raw.pop(timeframe, None)
+        if raw is not None:
+            self.last_candles[timeframe] = self._build_candles(raw)
+        candles = self.last_candles.get(timeframe, ())
+        return list(candles) if copy else tuple(candles)
+
+    def get_orderbook(self, copy: bool = False) -> Optional[Dict[str, Any]]:
+        """获取订单簿（默认返回只读视图，需要可变副本时传 copy=True）"""
+        if self._book_raw is not None:
+            self.last_orderbook = self._build_orderbook(self._book_raw)
+            self._book_raw = None
+        if self.last_orderbook is None:
+            return None
+        return self.last_orderbook.copy() if copy else MappingProxyType(self.last_orderbook)
 
     def is_running(self) -> bool:
         """检查是否正在运行"""
@@ -375,79 +806,102 @@ class OKXWS:
 
     async def _simulate_data(self):
         """生成模拟数据（用于测试）"""
-        import random
-
-        print("[OKXWS] 开始生成模拟数据...")
+        logger.info("开始生成模拟数据...")
 
         # 初始化价格
         price = 3200.0
+        rng = np.random.default_rng()
+
+        # 订单簿缓冲预分配为 (5, 2) ndarray，循环内整列向量化改写，
+        # 类型也与真实行情路径的 numpy 订单簿一致（回调留存需自行拷贝）
+        sim_asks = np.zeros((5, 2), dtype=np.float64)
+        sim_bids = np.zeros((5, 2), dtype=np.float64)
+        offsets = np.arange(1, 6) * 0.5
+        self.last_orderbook = {"asks": sim_asks, "bids": sim_bids, "timestamp": 0}
+        book_view = MappingProxyType(self.last_orderbook)
+
+        # ticker 字典同样只建一次，循环内原地改写字段；
+        # 只读视图对所有回调复用（K线要进历史缓存，仍每轮新建）
+        self.last_ticker = {
+            "last": 0.0,
+            "bid": 0.0,
+            "ask": 0.0,
+            "volume_24h": 0.0,
+            "change_24h": 0.0,
+            "timestamp": 0
+        }
+        ticker_view = MappingProxyType(self.last_ticker)
 
         while self._running:
+            # 每轮只取一次时间戳（毫秒整数，下游按等值比较使用）
+            now_ms = int(time.time() * 1000)
+
+            # 每轮三次 C 层批量抽样，取代十余次 Python 级
+            # random.random()/randint() 调用
+            f = rng.random(6)
+            qty = rng.integers(1, 101, size=10)
+            vol = rng.integers(100, 1001, size=2)
+
             # 模拟价格波动
-            price += (random.random() * 20 - 10)
+            price += (f[0] * 20 - 10)
             self.last_price = price
 
-            # 模拟 ticker
-            self.last_ticker = {
-                "last": price,
-                "bid": price - 1,
-                "ask": price + 1,
-                "volume_24h": 1000000 + random.random() * 100000,
-                "change_24h": (random.random() * 4 - 2),
-                "timestamp": str(int(time.time() * 1000))
-            }
+            # 模拟 ticker（原地改写）
+            ticker = self.last_ticker
+            ticker["last"] = price
+            ticker["bid"] = price - 1
+            ticker["ask"] = price + 1
+            ticker["volume_24h"] = 1000000 + f[1] * 100000
+            ticker["change_24h"] = f[2] * 4 - 2
+            ticker["timestamp"] = now_ms
 
-            # 触发 ticker 回调
-            for callback in self.callbacks.get("ticker", []):
-                try:
-                    callback(self.last_ticker.copy())
-                except Exception as e:
-                    print(f"[OKXWS] Ticker callback error: {e}")
+            # 触发 ticker 回调（共享只读视图）
+            for callback in self._ticker_cbs:
+                callback(ticker_view)
 
             # 模拟订单簿
-            self.last_orderbook = {
-                "asks": [[price + (i + 1) * 0.5, random.randint(1, 100)] for i in range(5)],
-                "bids": [[price - (i + 1) * 0.5, random.randint(1, 100)] for i in range(5)],
-                "timestamp": str(int(time.time() * 1000))
-            }
-
-            # 触发订单簿回调
-            for callback in self.callbacks.get("orderbook", []):
-                try:
-                    callback(self.last_orderbook.copy())
-                except Exception as e:
-                    print(f"[OKXWS] Orderbook callback error: {e}")
-
-            # 模拟 K线
-            if not self.last_candles.get("5m"):
-                self.last_candles["5m"] = []
+            sim_asks[:, 0] = price + offsets
+            sim_asks[:, 1] = qty[:5]
+            sim_bids[:, 0] = price - offsets
+            sim_bids[:, 1] = qty[5:]
+            self.last_orderbook["timestamp"] = now_ms
+
+            # 触发订单簿回调（共享只读视图）
+            for callback in self._book_cbs:
+                callback(book_view)
+
+            # 模拟 K线（有界 deque，写满自动淘汰最旧一根，免去 O(n) 的 pop(0)）
+            candles_5m = self.last_candles.get("5m")
+            if candles_5m is None:
+                candles_5m = deque(maxlen=100)
+                self.last_candles["5m"] = candles_5m
 
             candle = {
-                "timestamp": str(int(time.time() * 1000)),
-                "open": price - random.random() * 5,
-                "high": price + random.random() * 5,
-                "low": price - random.random() * 5,
+                "timestamp": now_ms,
+                "open": price - f[3] * 5,
+                "high": price + f[4] * 5,
+                "low": price - f[5] * 5,
                 "close": price,
-                "volume": random.randint(100, 1000),
-                "volume_ccy": random.randint(100, 1000) * price
+                "volume": int(vol[0]),
+                "volume_ccy": int(vol[1]) * price
             }
 
-            self.last_candles["5m"].append(candle)
-
-            if len(self.last_candles["5m"]) > 100:
-                self.last_candles["5m"].pop(0)
+            candles_5m.append(candle)
 
-            for callback in self.callbacks.get("candle", []):
-                try:
-                    callback("5m", [candle])
-                except Exception as e:
-                    print(f"[OKXWS] Candle callback error: {e}")
+            for callback in self._candle_cbs:
+                callback("5m", (candle,))
 
             await asyncio.sleep(1)
 
 
 class PriceCache:
-    """价格缓存，用于存储历史价格"""
+    """
+    价格缓存，用于存储历史价格
+
+    固定容量的 numpy 环形缓冲：float64 连续存储，写入 O(1) 且
+    预热后零分配；相比装箱的 Python float 列表省内存也利于
+    下游指标直接在 ndarray 上向量化计算
+    """
 
     def __init__(self, max_size: int = 1000):
         """
@@ -457,8 +911,10 @@ class PriceCache:
             max_size: 最大缓存数量
         """
         self.max_size = max_size
-        self.prices: List[float] = []
-        self.timestamps: List[float] = []
+        self._prices = np.empty(max_size, dtype=np.float64)
+        self._ts = np.empty(max_size, dtype=np.float64)
+        self._head = 0  # 下一个写入位置
+        self._size = 0
 
     def add_price(self, price: float, timestamp: Optional[float] = None):
         """
@@ -471,14 +927,25 @@ class PriceCache:
         if timestamp is None:
             timestamp = time.time()
 
-        self.prices.append(price)
-        self.timestamps.append(timestamp)
-
-        if len(self.prices) > self.max_size:
-            self.prices.pop(0)
-            self.timestamps.pop(0)
-
-    def get_prices(self, count: int = 100) -> List[float]:
+        head = self._head
+        self._prices[head] = price
+        self._ts[head] = timestamp
+        self._head = (head + 1) % self.max_size
+        if self._size < self.max_size:
+            self._size += 1
+
+    def _window(self, buf: np.ndarray, count: int) -> np.ndarray:
+        """取最近 count 个元素；未环回时返回零拷贝视图"""
+        count = min(count, self._size)
+        if count <= 0:
+            return buf[:0]
+        start = self._head - count
+        if start >= 0:
+            return buf[start:self._head]
+        # 环回：尾段与头段拼接（一次拷贝）
+        return np.concatenate((buf[start + self.max_size:], buf[:self._head]))
+
+    def get_prices(self, count: int = 100) -> np.ndarray:
         """
         获取最近 N 个价格
 
@@ -486,11 +953,11 @@ class PriceCache:
             count: 数量
 
         Returns:
-            价格列表
+            价格数组（时间升序）
         """
-        return self.prices[-count:]
+        return self._window(self._prices, count)
 
-    def get_timestamps(self, count: int = 100) -> List[float]:
+    def get_timestamps(self, count: int = 100) -> np.ndarray:
         """
         获取最近 N 个时间戳
 
@@ -498,15 +965,58 @@ class PriceCache:
             count: 数量
 
         Returns:
-            时间戳列表
+            时间戳数组（时间升序）
+        """
+        return self._window(self._ts, count)
+
+    def sma(self, window: int = 20) -> Optional[float]:
+        """
+        最近 window 个价格的简单均线
+
+        Args:
+            window: 窗口长度
+
+        Returns:
+            均值，样本不足返回 None
+        """
+        if window <= 0 or self._size < window:
+            return None
+        return float(_sma_tail(self._window(self._prices, window), window))
+
+    def stdev(self, window: int = 20) -> Optional[float]:
+        """
+        最近 window 个价格的标准差
+
+        Args:
+            window: 窗口长度
+
+        Returns:
+            标准差，样本不足返回 None
+        """
+        if window <= 0 or self._size < window:
+            return None
+        return float(_stdev_tail(self._window(self._prices, window), window))
+
+    def ema(self, alpha: float, count: int = 100) -> Optional[float]:
+        """
+        最近 count 个价格的指数均线
+
+        Args:
+            alpha: 平滑系数 (0, 1]
+            count: 参与计算的价格数量
+
+        Returns:
+            EMA 值，缓存为空返回 None
         """
-        return self.timestamps[-count:]
+        if self._size == 0:
+            return None
+        return float(_ema_tail(self._window(self._prices, count), alpha))
 
     def clear(self):
         """清空缓存"""
-        self.prices = []
-        self.timestamps = []
+        self._head = 0
+        self._size = 0
 
     def size(self) -> int:
         """获取缓存大小"""
-        return len(self.prices)
+        return self._size
@@ -87,7 +87,7 @@ class QuantBot:
 
         try:
             # 初始化交易引擎
-            self.trade_engine.initialize()
+            await self.trade_engine.initialize()
 
             # 启动 WebSocket
             self.logger.info("启动 WebSocket 行情订阅...")
@@ -133,7 +133,7 @@ class QuantBot:
                 funding_rate = None
                 if int(asyncio.get_event_loop().time()) % 300 == 0:
                     try:
-                        funding_rate = self.okx_rest.get_funding_rate(self.config["trade"]["symbol"])
+                        funding_rate = await self.okx_rest.get_funding_rate_async(self.config["trade"]["symbol"])
                     except:
                         pass
 
@@ -172,7 +172,7 @@ class QuantBot:
                     signal = self.signal_engine.generate_signal()
                     if signal:
                         self.logger.info(f"检测到入场信号: {signal['strategy']} {signal['direction']}")
-                        self.trade_engine.process_entry_signal(signal)
+                        await self.trade_engine.process_entry_signal(signal)
 
                 # 等待下一次检查
                 await asyncio.sleep(check_interval)
@@ -2,9 +2,76 @@
 技术指标计算模块
 提供 MA、VWAP、ATR 等常用技术指标的计算功能
 """
+import math
+
 import numpy as np
 from typing import List, Dict, Optional
 
+from utils._njit import njit
+
+
+@njit(cache=True, fastmath=True)
+def _sma_loop(closes: np.ndarray, period: int) -> float:
+    """SMA 热点循环（最后 period 根的均值）"""
+    total = 0.0
+    n = closes.shape[0]
+    for i in range(n - period, n):
+        total += closes[i]
+    return total / period
+
+
+@njit(cache=True, fastmath=True)
+def _ema_loop(closes: np.ndarray, period: int) -> float:
+    """EMA 热点循环（SMA 种子 + 递推）"""
+    multiplier = 2.0 / (period + 1)
+    ema = 0.0
+    for i in range(period):
+        ema += closes[i]
+    ema /= period
+    for i in range(period, closes.shape[0]):
+        ema = (closes[i] - ema) * multiplier + ema
+    return ema
+
+
+@njit(cache=True, fastmath=True)
+def _vwap_loop(prices: np.ndarray, volumes: np.ndarray) -> float:
+    """VWAP 热点循环，总成交量为 0 时返回 nan"""
+    total_pv = 0.0
+    total_v = 0.0
+    for i in range(prices.shape[0]):
+        total_pv += prices[i] * volumes[i]
+        total_v += volumes[i]
+    if total_v == 0.0:
+        return np.nan
+    return total_pv / total_v
+
+
+@njit(cache=True, fastmath=True)
+def _atr_loop(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int) -> float:
+    """ATR 热点循环（RMA 平滑），TR 序列不足时返回 nan"""
+    n = closes.shape[0]
+    if n - 1 < period:
+        return np.nan
+
+    atr = 0.0
+    for i in range(1, n):
+        tr = highs[i] - lows[i]
+        high_close = abs(highs[i] - closes[i - 1])
+        if high_close > tr:
+            tr = high_close
+        low_close = abs(lows[i] - closes[i - 1])
+        if low_close > tr:
+            tr = low_close
+
+        if i <= period:
+            atr += tr
+            if i == period:
+                atr /= period
+        else:
+            atr = (atr * (period - 1) + tr) / period
+
+    return atr
+
 
 class TechnicalIndicators:
     """技术指标计算器"""
@@ -23,7 +90,7 @@ class TechnicalIndicators:
         """
         if len(data) < period:
             return None
-        return sum(data[-period:]) / period
+        return _sma_loop(np.asarray(data, dtype=np.float64), period)
 
     @staticmethod
     def ema(data: List[float], period: int) -> Optional[float]:
@@ -39,16 +106,7 @@ class TechnicalIndicators:
         """
         if len(data) < period:
             return None
-
-        # 初始值使用 SMA
-        multiplier = 2 / (period + 1)
-        ema = sum(data[:period]) / period
-
-        # 计算 EMA
-        for price in data[period:]:
-            ema = (price - ema) * multiplier + ema
-
-        return ema
+        return _ema_loop(np.asarray(data, dtype=np.float64), period)
 
     @staticmethod
     def vwap(prices: List[float], volumes: List[float]) -> Optional[float]:
@@ -65,13 +123,11 @@ class TechnicalIndicators:
         if len(prices) != len(volumes) or len(prices) == 0:
             return None
 
-        total_price_volume = sum(p * v for p, v in zip(prices, volumes))
-        total_volume = sum(volumes)
-
-        if total_volume == 0:
-            return None
-
-        return total_price_volume / total_volume
+        vwap = _vwap_loop(
+            np.asarray(prices, dtype=np.float64),
+            np.asarray(volumes, dtype=np.float64)
+        )
+        return None if math.isnan(vwap) else vwap
 
     @staticmethod
     def atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> Optional[float]:
@@ -90,24 +146,13 @@ class TechnicalIndicators:
         if len(highs) < period + 1 or len(lows) < period + 1 or len(closes) < period + 1:
             return None
 
-        # 计算真实波幅 (TR)
-        tr_list = []
-        for i in range(1, len(closes)):
-            high_low = highs[i] - lows[i]
-            high_close = abs(highs[i] - closes[i-1])
-            low_close = abs(lows[i] - closes[i-1])
-            tr = max(high_low, high_close, low_close)
-            tr_list.append(tr)
-
-        # 计算 ATR (使用 RMA 方法)
-        if len(tr_list) < period:
-            return None
-
-        atr = sum(tr_list[:period]) / period
-        for tr in tr_list[period:]:
-            atr = (atr * (period - 1) + tr) / period
-
-        return atr
+        atr = _atr_loop(
+            np.asarray(highs, dtype=np.float64),
+            np.asarray(lows, dtype=np.float64),
+            np.asarray(closes, dtype=np.float64),
+            period
+        )
+        return None if math.isnan(atr) else atr
 
     @staticmethod
     def check_ma_cross(short_ma: float, long_ma: float, prev_short_ma: Optional[float], prev_long_ma: Optional[float]) -> Optional[str]:
@@ -223,40 +268,260 @@ class TechnicalIndicators:
 class MarketDataProcessor:
     """市场数据处理器"""
 
+    # 增量维护的 MA 周期（5m K线）
+    MA_PERIODS = (5, 15, 60)
+
+    # 各周期保留的K线数量
+    MAX_BARS = 100
+
+    # 环形缓冲区物理容量（写满后把窗口整体搬回头部，摊还 O(1)）
+    _CAPACITY = 256
+
+    # SoA 列布局：open/high/low/close/volume
+    _COL_OPEN, _COL_HIGH, _COL_LOW, _COL_CLOSE, _COL_VOLUME = range(5)
+
     def __init__(self):
         self.indicators = TechnicalIndicators()
-        self.candles_5m: List[Dict] = []
-        self.candles_15m: List[Dict] = []
+
+        # K线数据：预分配的 (N, 5) float64 缓冲区，按列存储 OHLCV，
+        # 避免每根K线一个 dict 的装箱开销；时间戳列表与缓冲区行对齐
+        self._ohlcv: Dict[str, np.ndarray] = {
+            "5m": np.empty((self._CAPACITY, 5), dtype=np.float64),
+            "15m": np.empty((self._CAPACITY, 5), dtype=np.float64),
+        }
+        self._ts: Dict[str, List[str]] = {"5m": [], "15m": []}
+        self._start: Dict[str, int] = {"5m": 0, "15m": 0}
+        self._end: Dict[str, int] = {"5m": 0, "15m": 0}
+
+        # MA 增量状态：已收盘部分的和只在新K线出现时滚动一次，
+        # 每个 tick 只需加上正在形成的K线收盘价，避免重复求和
+        self._last_bar_ts_5m: Optional[str] = None
+        self._ma_closed_sums: Dict[int, Optional[float]] = {p: None for p in self.MA_PERIODS}
+        self.ma_5: Optional[float] = None
+        self.ma_15: Optional[float] = None
+        self.ma_60: Optional[float] = None
+        self.ma_5_prev: Optional[float] = None
+        self.ma_15_prev: Optional[float] = None
+
+        # 流式指标状态（5m 热路径）：K线收盘时 O(1) 滚动，
+        # 读取时只需叠加正在形成的K线
+        self._stream_closed_n: int = -1          # 已处理的收盘K线数量
+        self._vwap_window: int = 390 // 5        # 默认 VWAP 窗口（根）
+        self._vwap_pv_sum: float = 0.0           # 已收盘部分 Σ(价格×成交量)
+        self._vwap_v_sum: float = 0.0            # 已收盘部分 Σ成交量
+        self._vwap_closed_count: int = 0
+        self._atr_period: int = 14
+        self._atr_value: Optional[float] = None  # 已收盘K线的 RMA ATR
+
+        # 指标结果缓存：同一个 tick 内重复调用 get_ma/get_vwap/get_atr
+        # 直接返回缓存值，数据更新时整体失效
+        self._indicator_cache: Dict[tuple, Optional[float]] = {}
 
     def update_5m_candles(self, candles: List[Dict]):
         """更新5分钟K线数据"""
         if candles:
-            self.candles_5m = candles[-100:]  # 保留最近100根
+            self._update_candles("5m", candles)
+            self._update_ma_state()
+            self._indicator_cache.clear()
 
     def update_15m_candles(self, candles: List[Dict]):
         """更新15分钟K线数据"""
         if candles:
-            self.candles_15m = candles[-100:]  # 保留最近100根
-
-    def get_close_prices(self, timeframe: str = "5m") -> List[float]:
-        """获取收盘价列表"""
-        candles = self.candles_5m if timeframe == "5m" else self.candles_15m
-        return [c["close"] for c in candles]
+            self._update_candles("15m", candles)
+            self._indicator_cache.clear()
+
+    def _write_bar(self, timeframe: str, row: int, candle: Dict):
+        """把一根K线写入缓冲区指定行"""
+        buf = self._ohlcv[timeframe]
+        buf[row, self._COL_OPEN] = candle["open"]
+        buf[row, self._COL_HIGH] = candle["high"]
+        buf[row, self._COL_LOW] = candle["low"]
+        buf[row, self._COL_CLOSE] = candle["close"]
+        buf[row, self._COL_VOLUME] = candle["volume"]
+
+    def _append_bar(self, timeframe: str, candle: Dict):
+        """追加一根K线，必要时压缩缓冲区并滑动窗口"""
+        if self._end[timeframe] == self._CAPACITY:
+            # 缓冲区写满：把最近的窗口整体搬回头部
+            buf = self._ohlcv[timeframe]
+            keep = self.MAX_BARS
+            buf[:keep] = buf[self._CAPACITY - keep:self._CAPACITY]
+            self._ts[timeframe] = self._ts[timeframe][-keep:]
+            self._start[timeframe] = 0
+            self._end[timeframe] = keep
+
+        row = self._end[timeframe]
+        self._write_bar(timeframe, row, candle)
+        self._ts[timeframe].append(candle.get("timestamp"))
+        self._end[timeframe] = row + 1
+
+        # 滑动窗口：最多保留 MAX_BARS 根
+        if self._end[timeframe] - self._start[timeframe] > self.MAX_BARS:
+            self._start[timeframe] += 1
+
+    def _update_candles(self, timeframe: str, candles: List[Dict]):
+        """
+        将K线快照合并进 SoA 缓冲区
 
-    def get_high_prices(self, timeframe: str = "5m") -> List[float]:
-        """获取最高价列表"""
-        candles = self.candles_5m if timeframe == "5m" else self.candles_15m
-        return [c["high"] for c in candles]
+        正常情况下每个 tick 只改写正在形成的K线一行；
+        新K线出现时补写收盘值并追加新行
+        """
+        ts_list = self._ts[timeframe]
+        last_ts = ts_list[len(ts_list) - 1] if ts_list else None
+        latest_ts = candles[-1].get("timestamp")
+
+        if last_ts is None:
+            # 首次更新：批量载入快照
+            for c in candles[-self.MAX_BARS:]:
+                self._append_bar(timeframe, c)
+        elif latest_ts == last_ts:
+            # 当前K线仍在形成：原地改写最后一行
+            self._write_bar(timeframe, self._end[timeframe] - 1, candles[-1])
+        else:
+            # 出现新K线：先用收盘值补写前一行，再追加未入库的K线
+            if len(candles) > 1:
+                self._write_bar(timeframe, self._end[timeframe] - 1, candles[-2])
+            for c in candles:
+                ts = c.get("timestamp")
+                if ts is not None and last_ts is not None and ts <= last_ts:
+                    continue
+                self._append_bar(timeframe, c)
+
+    def _on_bar_close(self, closed_n: int):
+        """
+        一根5mK线收盘后的 O(1) 流式更新（VWAP 累加器、RMA ATR）
 
-    def get_low_prices(self, timeframe: str = "5m") -> List[float]:
-        """获取最低价列表"""
-        candles = self.candles_5m if timeframe == "5m" else self.candles_15m
-        return [c["low"] for c in candles]
+        Args:
+            closed_n: 当前已收盘K线数量（刚收盘的一根为下标 closed_n-1）
+        """
+        closes = self.get_close_prices("5m")
+        highs = self.get_high_prices("5m")
+        lows = self.get_low_prices("5m")
+        volumes = self.get_volumes("5m")
+
+        idx = closed_n - 1
+        close = float(closes[idx])
+        volume = float(volumes[idx])
+
+        # VWAP：新收盘K线进入窗口，最老的一根滑出
+        self._vwap_pv_sum += close * volume
+        self._vwap_v_sum += volume
+        self._vwap_closed_count += 1
+        if self._vwap_closed_count > self._vwap_window - 1:
+            leave_idx = idx - (self._vwap_window - 1)
+            leave_close = float(closes[leave_idx])
+            leave_volume = float(volumes[leave_idx])
+            self._vwap_pv_sum -= leave_close * leave_volume
+            self._vwap_v_sum -= leave_volume
+            self._vwap_closed_count -= 1
+
+        # ATR：RMA 递推
+        if self._atr_value is not None and idx >= 1:
+            prev_close = float(closes[idx - 1])
+            tr = max(
+                float(highs[idx]) - float(lows[idx]),
+                abs(float(highs[idx]) - prev_close),
+                abs(float(lows[idx]) - prev_close)
+            )
+            period = self._atr_period
+            self._atr_value = (self._atr_value * (period - 1) + tr) / period
+        else:
+            self._seed_atr(closed_n)
+
+    def _reseed_streams(self, closed_n: int):
+        """批量重建流式 VWAP/ATR 状态（首次载入或K线跳档时使用）"""
+        closes = self.get_close_prices("5m")
+        volumes = self.get_volumes("5m")
+
+        window = self._vwap_window - 1  # 已收盘部分窗口
+        start = max(0, closed_n - window)
+        self._vwap_pv_sum = float(np.dot(closes[start:closed_n], volumes[start:closed_n]))
+        self._vwap_v_sum = float(np.sum(volumes[start:closed_n]))
+        self._vwap_closed_count = closed_n - start
+
+        self._seed_atr(closed_n)
+
+    def _seed_atr(self, closed_n: int):
+        """用已收盘K线批量计算一次 ATR 作为递推起点，数据不足则保持 None"""
+        if closed_n < self._atr_period + 1:
+            self._atr_value = None
+            return
+
+        self._atr_value = self.indicators.atr(
+            self.get_high_prices("5m")[:closed_n],
+            self.get_low_prices("5m")[:closed_n],
+            self.get_close_prices("5m")[:closed_n],
+            self._atr_period
+        )
+
+    def _update_ma_state(self):
+        """
+        增量更新 5m MA 与流式指标状态
 
-    def get_volumes(self, timeframe: str = "5m") -> List[float]:
-        """获取成交量列表"""
-        candles = self.candles_5m if timeframe == "5m" else self.candles_15m
-        return [c["volume"] for c in candles]
+        新K线出现时滚动一次“已收盘”部分和并保存前一期 MA；
+        tick 内只做 O(1) 运算（已收盘和 + 当前收盘价）
+        """
+        closes = self.get_close_prices("5m")
+        if len(closes) == 0:
+            return
+
+        ts_list = self._ts["5m"]
+        latest_ts = ts_list[-1]
+
+        if latest_ts != self._last_bar_ts_5m:
+            # 新K线：滚动前一期 MA，重建各周期的已收盘部分和
+            self._last_bar_ts_5m = latest_ts
+            self.ma_5_prev = self.ma_5
+            self.ma_15_prev = self.ma_15
+
+            closed = closes[:-1]
+            for period in self.MA_PERIODS:
+                if len(closed) >= period - 1:
+                    self._ma_closed_sums[period] = float(np.sum(closed[len(closed) - (period - 1):]))
+                else:
+                    self._ma_closed_sums[period] = None
+
+            # 流式 VWAP/ATR：逐根收盘正常走 O(1) 路径，跳档时重建
+            closed_n = len(closes) - 1
+            if closed_n == self._stream_closed_n + 1 and closed_n >= 1:
+                self._on_bar_close(closed_n)
+            else:
+                self._reseed_streams(closed_n)
+            self._stream_closed_n = closed_n
+
+        # 当前K线仍在形成中，加上最新收盘价即可得到 MA
+        current_close = float(closes[-1])
+        ma_values = {}
+        for period in self.MA_PERIODS:
+            closed_sum = self._ma_closed_sums[period]
+            if closed_sum is None or len(closes) < period:
+                ma_values[period] = None
+            else:
+                ma_values[period] = (closed_sum + current_close) / period
+
+        self.ma_5 = ma_values[5]
+        self.ma_15 = ma_values[15]
+        self.ma_60 = ma_values[60]
+
+    def _column(self, timeframe: str, col: int) -> np.ndarray:
+        """获取某一列的零拷贝视图"""
+        return self._ohlcv[timeframe][self._start[timeframe]:self._end[timeframe], col]
+
+    def get_close_prices(self, timeframe: str = "5m") -> np.ndarray:
+        """获取收盘价数组（零拷贝视图）"""
+        return self._column(timeframe, self._COL_CLOSE)
+
+    def get_high_prices(self, timeframe: str = "5m") -> np.ndarray:
+        """获取最高价数组（零拷贝视图）"""
+        return self._column(timeframe, self._COL_HIGH)
+
+    def get_low_prices(self, timeframe: str = "5m") -> np.ndarray:
+        """获取最低价数组（零拷贝视图）"""
+        return self._column(timeframe, self._COL_LOW)
+
+    def get_volumes(self, timeframe: str = "5m") -> np.ndarray:
+        """获取成交量数组（零拷贝视图）"""
+        return self._column(timeframe, self._COL_VOLUME)
 
     def get_vwap(self, timeframe: str = "5m", period: int = 390) -> Optional[float]:
         """
@@ -269,19 +534,36 @@ class MarketDataProcessor:
         Returns:
             VWAP 值
         """
-        candles = self.candles_5m if timeframe == "5m" else self.candles_15m
+        cache_key = ("vwap", timeframe, period)
+        if cache_key in self._indicator_cache:
+            return self._indicator_cache[cache_key]
+
+        closes = self.get_close_prices(timeframe)
 
         # 计算需要的K线数量
         candles_needed = period // (5 if timeframe == "5m" else 15)
 
-        if len(candles) < candles_needed:
+        if len(closes) < candles_needed:
+            self._indicator_cache[cache_key] = None
             return None
 
-        recent_candles = candles[-candles_needed:]
-        prices = [c["close"] for c in recent_candles]
-        volumes = [c["volume"] for c in recent_candles]
+        # 流式快路径：默认窗口的 5m VWAP 直接由累加器叠加当前K线得出
+        if timeframe == "5m" and candles_needed == self._vwap_window \
+                and self._vwap_closed_count == candles_needed - 1:
+            volumes = self.get_volumes("5m")
+            current_v = float(volumes[-1])
+            total_v = self._vwap_v_sum + current_v
+            vwap = None if total_v == 0 else \
+                (self._vwap_pv_sum + float(closes[-1]) * current_v) / total_v
+            self._indicator_cache[cache_key] = vwap
+            return vwap
 
-        return self.indicators.vwap(prices, volumes)
+        prices = closes[len(closes) - candles_needed:]
+        volumes = self.get_volumes(timeframe)[len(closes) - candles_needed:]
+
+        vwap = self.indicators.vwap(prices, volumes)
+        self._indicator_cache[cache_key] = vwap
+        return vwap
 
     def get_ma(self, period: int, timeframe: str = "5m", ma_type: str = "sma") -> Optional[float]:
         """
@@ -295,12 +577,19 @@ class MarketDataProcessor:
         Returns:
             MA 值
         """
+        cache_key = ("ma", timeframe, period, ma_type)
+        if cache_key in self._indicator_cache:
+            return self._indicator_cache[cache_key]
+
         closes = self.get_close_prices(timeframe)
 
         if ma_type == "ema":
-            return self.indicators.ema(closes, period)
+            ma = self.indicators.ema(closes, period)
         else:
-            return self.indicators.sma(closes, period)
+            ma = self.indicators.sma(closes, period)
+
+        self._indicator_cache[cache_key] = ma
+        return ma
 
     def get_atr(self, period: int = 14, timeframe: str = "5m") -> Optional[float]:
         """
@@ -313,11 +602,29 @@ class MarketDataProcessor:
         Returns:
             ATR 值
         """
+        cache_key = ("atr", timeframe, period)
+        if cache_key in self._indicator_cache:
+            return self._indicator_cache[cache_key]
+
         highs = self.get_high_prices(timeframe)
         lows = self.get_low_prices(timeframe)
         closes = self.get_close_prices(timeframe)
 
-        return self.indicators.atr(highs, lows, closes, period)
+        # 流式快路径：已收盘部分的 RMA ATR 叠加当前K线的 TR 即可
+        if timeframe == "5m" and period == self._atr_period and self._atr_value is not None:
+            prev_close = float(closes[-2])
+            tr = max(
+                float(highs[-1]) - float(lows[-1]),
+                abs(float(highs[-1]) - prev_close),
+                abs(float(lows[-1]) - prev_close)
+            )
+            atr = (self._atr_value * (period - 1) + tr) / period
+            self._indicator_cache[cache_key] = atr
+            return atr
+
+        atr = self.indicators.atr(highs, lows, closes, period)
+        self._indicator_cache[cache_key] = atr
+        return atr
 
     def get_avg_atr(self, period: int = 14, bars: int = 24, timeframe: str = "5m") -> Optional[float]:
         """
@@ -331,11 +638,16 @@ class MarketDataProcessor:
         Returns:
             平均 ATR 值
         """
+        cache_key = ("avg_atr", timeframe, period, bars)
+        if cache_key in self._indicator_cache:
+            return self._indicator_cache[cache_key]
+
         highs = self.get_high_prices(timeframe)
         lows = self.get_low_prices(timeframe)
         closes = self.get_close_prices(timeframe)
 
         if len(highs) < period + bars:
+            self._indicator_cache[cache_key] = None
             return None
 
         atr_values = []
@@ -348,6 +660,9 @@ class MarketDataProcessor:
                 atr_values.append(atr)
 
         if not atr_values:
+            self._indicator_cache[cache_key] = None
             return None
 
-        return sum(atr_values) / len(atr_values)
+        avg_atr = sum(atr_values) / len(atr_values)
+        self._indicator_cache[cache_key] = avg_atr
+        return avg_atr
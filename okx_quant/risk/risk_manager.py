@@ -2,6 +2,7 @@
 风控模块
 提供各种风控检查功能，确保交易安全
 """
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 from enum import Enum
@@ -42,6 +43,9 @@ class RiskManager:
         # 每日重置时间
         self.last_reset_date: Optional[str] = None
 
+        # 权益缓存时间戳（入场信号不频繁，几秒内的权益可直接复用）
+        self._equity_updated_at: float = 0.0
+
     def reset_daily(self):
         """重置每日统计数据"""
         today = datetime.now().strftime("%Y-%m-%d")
@@ -68,6 +72,7 @@ class RiskManager:
             self.start_equity = equity
 
         self.current_equity = equity
+        self._equity_updated_at = time.time()
 
         # 更新最高权益
         if equity > self.max_daily_equity:
@@ -76,6 +81,20 @@ class RiskManager:
         # 重置每日统计
         self.reset_daily()
 
+    def get_cached_equity(self, max_age: float = 5.0) -> Optional[float]:
+        """
+        获取缓存的账户权益
+
+        Args:
+            max_age: 缓存有效期（秒）
+
+        Returns:
+            缓存未过期时返回权益，否则返回 None
+        """
+        if self.current_equity > 0 and time.time() - self._equity_updated_at < max_age:
+            return self.current_equity
+        return None
+
     def check_position_risk(
         self,
         equity: float,
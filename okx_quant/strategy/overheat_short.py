@@ -99,9 +99,10 @@ class OverheatShortStrategy:
 
         # 条件3：买盘深度（前5档）减少 ≥ 20%
         depth_dropped = False
-        if orderbook_bids and prev_orderbook_bids and len(orderbook_bids) >= 5 and len(prev_orderbook_bids) >= 5:
-            current_bid_volume = sum(size for _, size in orderbook_bids[:5])
-            prev_bid_volume = sum(size for _, size in prev_orderbook_bids[:5])
+        # len() 判空，兼容列表和 ndarray（ndarray 不能直接做布尔判断）
+        if len(orderbook_bids) >= 5 and len(prev_orderbook_bids) >= 5:
+            current_bid_volume = float(sum(row[1] for row in orderbook_bids[:5]))
+            prev_bid_volume = float(sum(row[1] for row in prev_orderbook_bids[:5]))
 
             if prev_bid_volume > 0:
                 drop_ratio = (prev_bid_volume - current_bid_volume) / prev_bid_volume
@@ -25,9 +25,10 @@ async def test_real_connection():
         return True
 
     def on_orderbook(orderbook):
-        best_bid = orderbook["bids"][0] if orderbook["bids"] else None
-        best_ask = orderbook["asks"][0] if orderbook["asks"] else None
-        if best_bid and best_ask:
+        # len() 判空，兼容 ndarray 档位（ndarray 不能直接做布尔判断）
+        best_bid = orderbook["bids"][0] if len(orderbook["bids"]) else None
+        best_ask = orderbook["asks"][0] if len(orderbook["asks"]) else None
+        if best_bid is not None and best_ask is not None:
             print(f"  ✓ 收到订单簿: 买一={best_bid[0]:.2f}({best_bid[1]}), 卖一={best_ask[0]:.2f}({best_ask[1]})")
         received_data["orderbook"] += 1
 
@@ -0,0 +1,20 @@
+"""
+Numba 可选加速
+numba 可用时导出真正的 njit，否则退化为恒等装饰器，保证纯 Python 环境可用
+"""
+
+try:
+    from numba import njit  # noqa: F401
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba 不可用时的兜底实现：原样返回被装饰函数"""
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -130,6 +130,10 @@ class TradeLogger:
         Args:
             order_data: 订单数据
         """
+        # 纳秒时间戳只在落日志时格式化为可读时间
+        ts_ns = order_data.get("timestamp_ns")
+        if ts_ns is not None:
+            order_data = {**order_data, "time": datetime.fromtimestamp(ts_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")}
         logger.info(f"[ORDER] {json.dumps(order_data, ensure_ascii=False)}")
 
     def exception(self, exc: Exception, context: str = ""):